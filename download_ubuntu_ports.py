@@ -6,174 +6,549 @@ Downloads files from https://ports.ubuntu.com/ubuntu-ports/pool/universe
 
 import os
 import sys
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import re
+import gzip
+import json
+import asyncio
+import hashlib
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+try:
+    # Optional: HTTP/2 multiplexing for the many small listing requests.
+    # httpx needs the h2 extra for http2=True (pip install httpx[http2]),
+    # so probe for both and treat a bare httpx install as unavailable.
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
 import time
 from pathlib import Path
+import atexit
+import queue
 import logging
+import logging.handlers
 import argparse
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+def _setup_logging():
+    """Configure fire-and-forget logging through a queue.
+
+    Workers only pay for enqueueing a record; a single listener thread
+    does the timestamp formatting and terminal write, so the logging lock
+    never serializes the download path at high concurrency.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '[%(asctime)s] %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+_setup_logging()
 logger = logging.getLogger(__name__)
 
+# Href extractor for Apache autoindex pages; leading '/' and '?' (absolute
+# paths, sort links) are excluded by the character class. One C-level pass
+# over the page is much cheaper than building a DOM with BeautifulSoup.
+HREF_RE = re.compile(rb'<a href="([^"?/][^"]*)"')
+
 
 class UbuntuPortsDownloader:
-    def __init__(self, base_url, output_dir="downloads", start_dir=None, end_dir=None):
+    # Worker tasks draining the directory and file queues; separate pools
+    # keep discovery running while downloads are in flight
+    NUM_CRAWLERS = 4
+    NUM_DOWNLOADERS = 16
+    # Backpressure bound for pending file downloads
+    FILE_QUEUE_SIZE = 1024
+    # Maximum concurrent requests against a single host (politeness limit)
+    PER_HOST_LIMIT = 8
+    # Read size for streaming download bodies; 1 MiB matches typical TCP
+    # window and disk write granularity, cutting per-chunk overhead vs 8 KiB
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, base_url, output_dir="downloads", start_dir=None, end_dir=None,
+                 suite='noble', arch='arm64'):
         self.base_url = base_url.rstrip('/')
         self.output_dir = output_dir
         self.start_dir = start_dir  # First-level directory to start from (e.g., 'h/')
         self.end_dir = end_dir      # First-level directory to end at (e.g., 'm/')
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Filter bounds are immutable after construction; precompute the
+        # comparison keys instead of rstrip'ing them on every check
+        self._start_key = start_dir.rstrip('/') if start_dir else None
+        self._end_key = end_dir.rstrip('/') if end_dir else None
+        # Fixed URL prefix stripped off when mapping URLs to local paths
+        self._strip_prefix = f"{self.base_url}/"
+        self.suite = suite          # Distribution suite for the Packages.gz index
+        self.arch = arch            # Architecture for the Packages.gz index
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        }
+        self.session = None         # aiohttp.ClientSession, created in start()
+        self.listing_client = None  # httpx.AsyncClient (HTTP/2), if httpx is installed
+        self.semaphore = None       # per-host politeness limit, created in start()
+        self._write_pool = None     # ThreadPoolExecutor for pwrite, created in start()
         self.downloaded_count = 0
         self.failed_count = 0
         self.skipped_count = 0
-        
-    def get_directory_listing(self, url):
+        self.hash_index = {}       # sha256 hex -> local path of the stored blob
+        self.expected_hashes = {}  # local path -> sha256 hex from package indexes
+        self.expected_sizes = {}   # local path -> size in bytes from package indexes
+        self.index_path = os.path.join(output_dir, '.sha256.json')
+        self._ensured_dirs = set()  # directories already created this run
+        self._load_hash_index()
+
+    def _ensure_dir(self, path):
+        """Create a directory once per run instead of mkdir'ing per file.
+
+        Workers run on one event loop and there is no await between the
+        check and the insert, so no lock is needed.
+        """
+        if path not in self._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._ensured_dirs.add(path)
+
+    def _load_hash_index(self):
+        """Load the persisted SHA-256 index of already-downloaded files."""
+        try:
+            with open(self.index_path) as f:
+                self.hash_index = json.load(f)
+            logger.info(f"Loaded hash index with {len(self.hash_index)} entries")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not load hash index {self.index_path}: {e}")
+
+    def _save_hash_index(self):
+        """Persist the SHA-256 index next to the downloads."""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.index_path, 'w') as f:
+                json.dump(self.hash_index, f)
+        except Exception as e:
+            logger.warning(f"Could not save hash index {self.index_path}: {e}")
+
+    def _hash_file(self, path):
+        """Compute the streaming SHA-256 of a file on disk."""
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while chunk := f.read(self.DOWNLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _register_blob(self, sha, local_path):
+        """Record a downloaded file in the index, hardlinking duplicates."""
+        existing = self.hash_index.get(sha)
+        if existing and existing != local_path and os.path.exists(existing):
+            # Identical content already on disk: keep one blob and hardlink
+            try:
+                os.link(existing, local_path + '.dedup')
+                os.replace(local_path + '.dedup', local_path)
+                logger.debug(f"Deduplicated (identical content): {os.path.basename(local_path)}")
+            except OSError:
+                # Cross-device or unsupported hardlink: keep the plain copy
+                self.hash_index[sha] = local_path
+        else:
+            self.hash_index[sha] = local_path
+
+    async def _load_package_index(self):
+        """
+        Fetch and parse the Packages.gz index for the configured suite/arch.
+
+        The index enumerates every file with its size and SHA-256 up front,
+        which lets us skip the entire HTML listing crawl.
+
+        Returns:
+            list: (url, local_path) pairs, empty if the index is unavailable
+        """
+        if '/pool/' not in self.base_url:
+            return []
+        archive_root, _, component = self.base_url.partition('/pool/')
+        index_url = f"{archive_root}/dists/{self.suite}/{component}/binary-{self.arch}/Packages.gz"
+
+        try:
+            logger.info(f"Fetching package index: {index_url}")
+            async with self.session.get(index_url, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                response.raise_for_status()
+                compressed = await response.read()
+        except Exception as e:
+            logger.warning(f"Could not fetch package index {index_url}: {e}")
+            return []
+
+        # A 200 response is no guarantee of a valid index (transparent
+        # proxies and mirror error pages serve plain text), so parsing
+        # failures also fall back to the HTML crawl
+        try:
+            entries = []
+            filename = size = sha256 = None
+            lines = gzip.decompress(compressed).decode('utf-8', 'replace').splitlines()
+            for line in lines + ['']:  # trailing sentinel flushes the last stanza
+                if line.startswith('Filename: '):
+                    filename = line[len('Filename: '):].strip()
+                elif line.startswith('Size: '):
+                    size = line[len('Size: '):].strip()
+                elif line.startswith('SHA256: '):
+                    sha256 = line[len('SHA256: '):].strip()
+                elif not line:
+                    if filename:
+                        file_url = f"{archive_root}/{filename}"
+                        local_path = self.get_local_path(file_url)
+                        if sha256:
+                            self.expected_hashes[local_path] = sha256
+                        if size:
+                            self.expected_sizes[local_path] = int(size)
+                        entries.append((file_url, local_path))
+                    filename = size = sha256 = None
+        except Exception as e:
+            logger.warning(f"Could not parse package index {index_url}: {e}")
+            return []
+
+        return entries
+
+    async def get_directory_listing(self, url):
         """Fetch and parse directory listing from URL."""
         try:
-            logger.info(f"Fetching directory: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            logger.debug(f"Fetching directory: {url}")
+            async with self.semaphore:
+                if self.listing_client is not None:
+                    # HTTP/2 multiplexes listing requests over few connections
+                    response = await self.listing_client.get(url, timeout=30)
+                    response.raise_for_status()
+                    body = response.content
+                else:
+                    async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+
             links = []
-            
+
             # Find all links in the page
-            for link in soup.find_all('a'):
-                href = link.get('href')
-                if href and href not in ['../', '../', '/', '#']:
-                    # Skip parent directory and root links
-                    if not href.startswith('http') and not href.startswith('/'):
-                        links.append(href)
-            
+            for match in HREF_RE.finditer(body):
+                href = match.group(1).decode('ascii', 'ignore')
+                # Skip parent directory and external links
+                if href and href != '../' and not href.startswith('http'):
+                    links.append(href)
+
             return links
         except Exception as e:
             logger.error(f"Error fetching directory {url}: {e}")
             return []
-    
+
     def is_directory(self, link):
         """Check if a link is a directory (ends with /)."""
         return link.endswith('/')
-    
+
     def should_process_directory(self, dirname):
         """Check if a first-level directory should be processed based on start_dir and end_dir."""
         # Remove trailing slash for comparison
         dirname = dirname.rstrip('/')
-        
-        # If no filters set, process all directories
-        if not self.start_dir and not self.end_dir:
-            return True
-        
-        # If only start_dir is set, process from start_dir onwards
-        if self.start_dir and not self.end_dir:
-            return dirname >= self.start_dir.rstrip('/')
-        
-        # If only end_dir is set, process up to end_dir
-        if not self.start_dir and self.end_dir:
-            return dirname <= self.end_dir.rstrip('/')
-        
-        # If both are set, process the range
-        start = self.start_dir.rstrip('/')
-        end = self.end_dir.rstrip('/')
-        return start <= dirname <= end
-    
-    def download_file(self, url, local_path):
-        """Download a file from URL to local path."""
+
+        return ((self._start_key is None or dirname >= self._start_key) and
+                (self._end_key is None or dirname <= self._end_key))
+
+    async def _probe_remote_size(self, url):
+        """
+        Learn the remote file size from a one-byte Range probe.
+
+        A GET with 'Range: bytes=0-0' returns the true total in
+        Content-Range within a single roundtrip, and works on mirrors
+        where HEAD is disabled or reports stale sizes.
+
+        Returns:
+            int or None: Total size, or None if the server ignored the range
+        """
+        try:
+            async with self.semaphore:
+                async with self.session.get(url, headers={'Range': 'bytes=0-0'},
+                                            timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status == 206:
+                        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                        if total.isdigit():
+                            return int(total)
+        except Exception as e:
+            logger.debug(f"Size probe failed for {url}: {e}")
+        return None
+
+    async def download_file(self, url, local_path):
+        """Download a file from URL to local path, resuming partial files."""
         try:
-            # Check if file already exists
-            if os.path.exists(local_path):
-                local_size = os.path.getsize(local_path)
-                # Get remote file size
-                head_response = self.session.head(url, timeout=10)
-                remote_size = int(head_response.headers.get('content-length', 0))
-                
-                if local_size == remote_size:
-                    logger.info(f"Skipping (already exists): {os.path.basename(local_path)}")
+            # If the package index told us the hash and we already hold an
+            # identical blob, hardlink it instead of downloading again
+            expected = self.expected_hashes.get(local_path)
+            if expected and not os.path.exists(local_path):
+                existing = self.hash_index.get(expected)
+                if existing and os.path.exists(existing):
+                    self._ensure_dir(os.path.dirname(local_path))
+                    try:
+                        os.link(existing, local_path)
+                    except OSError:
+                        # Cross-device or unsupported hardlink: fall through
+                        # to a normal download instead of failing the file
+                        pass
+                    else:
+                        logger.debug(f"Linked (duplicate content): {os.path.basename(local_path)}")
+                        self.skipped_count += 1
+                        return True
+
+            # If a partial file exists, ask the server for the remainder instead
+            # of spending a HEAD round-trip on the size check
+            local_size = os.path.getsize(local_path) if os.path.exists(local_path) else 0
+
+            # With the index-announced size we can skip without any request
+            if local_size and self.expected_sizes.get(local_path) == local_size:
+                logger.debug(f"Skipping (already exists): {os.path.basename(local_path)}")
+                self.skipped_count += 1
+                return True
+
+            # Without an index size, a one-byte probe settles skip-vs-resume
+            # before committing to the full transfer
+            if local_size and local_path not in self.expected_sizes:
+                remote_size = await self._probe_remote_size(url)
+                if remote_size == local_size:
+                    logger.debug(f"Skipping (already exists): {os.path.basename(local_path)}")
                     self.skipped_count += 1
                     return True
-            
-            logger.info(f"Downloading: {url}")
-            response = self.session.get(url, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            # Get file size for progress
-            total_size = int(response.headers.get('content-length', 0))
-            
+                if remote_size is not None and remote_size < local_size:
+                    # Local file is larger than the remote: start over
+                    local_size = 0
+
+            headers = {'Range': f'bytes={local_size}-'} if local_size else {}
+
+            logger.debug(f"Downloading: {url}")
+
             # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            
+            self._ensure_dir(os.path.dirname(local_path))
+
             # Download with progress
             downloaded = 0
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-            
+            while True:
+                async with self.semaphore:
+                    async with self.session.get(url, headers=headers,
+                                                timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as response:
+                        if response.status == 416:
+                            # Check the advertised total before trusting 416
+                            # as "complete": a local file larger than the
+                            # remote copy triggers it too
+                            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                            if total.isdigit() and int(total) != local_size:
+                                logger.warning(f"Local file exceeds remote size, restarting: "
+                                               f"{os.path.basename(local_path)}")
+                                local_size = 0
+                                headers = {}
+                                continue
+                            logger.debug(f"Skipping (already exists): {os.path.basename(local_path)}")
+                            self.skipped_count += 1
+                            return True
+                        response.raise_for_status()
+
+                        if response.status == 206:
+                            # Server honoured the range: append the missing tail
+                            mode = 'ab'
+                        else:
+                            remote_size = int(response.headers.get('content-length', 0))
+                            if local_size and local_size == remote_size:
+                                logger.debug(f"Skipping (already exists): {os.path.basename(local_path)}")
+                                self.skipped_count += 1
+                                return True
+                            mode = 'wb'
+
+                        body_size = int(response.headers.get('content-length', 0))
+                        write_offset = local_size if mode == 'ab' else 0
+                        flags = os.O_WRONLY | os.O_CREAT | (0 if mode == 'ab' else os.O_TRUNC)
+
+                        # Hash while writing so the dedup index never needs a
+                        # second read pass over the file. Writes go through
+                        # os.pwrite on an executor thread with one write kept
+                        # in flight, so flushing a chunk to disk no longer
+                        # stalls the socket read (double buffering).
+                        hasher = hashlib.sha256()
+                        pending = None  # in-flight pwrite, drained before close
+                        fd = os.open(local_path, flags, 0o644)
+                        try:
+                            if body_size and hasattr(os, 'posix_fallocate'):
+                                try:
+                                    # Reserve the space up front to avoid
+                                    # incremental extent allocation
+                                    os.posix_fallocate(fd, write_offset, body_size)
+                                except OSError:
+                                    pass  # filesystem without fallocate support
+
+                            async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+                                hasher.update(chunk)
+                                if pending is not None:
+                                    await asyncio.wrap_future(pending)
+                                pending = self._write_pool.submit(
+                                    os.pwrite, fd, chunk, write_offset)
+                                write_offset += len(chunk)
+                                downloaded += len(chunk)
+                            if pending is not None:
+                                await asyncio.wrap_future(pending)
+                                pending = None
+                        finally:
+                            if pending is not None:
+                                # Never close the fd under an in-flight write:
+                                # a pwrite landing on a recycled descriptor
+                                # would corrupt whichever download owns it
+                                # next. result() waits synchronously, which
+                                # task cancellation cannot interrupt.
+                                try:
+                                    pending.result()
+                                except OSError:
+                                    pass
+                            os.close(fd)
+                break
+
+            # Index the new file by content hash, hardlinking duplicates
+            if mode == 'ab':
+                # Resumed download: the digest only covers the appended tail
+                sha = await asyncio.to_thread(self._hash_file, local_path)
+            else:
+                sha = hasher.hexdigest()
+            self._register_blob(sha, local_path)
+
             size_mb = downloaded / (1024 * 1024)
-            logger.info(f"✓ Downloaded: {os.path.basename(local_path)} ({size_mb:.2f} MB)")
+            logger.debug(f"✓ Downloaded: {os.path.basename(local_path)} ({size_mb:.2f} MB)")
             self.downloaded_count += 1
+            if self.downloaded_count % 100 == 0:
+                logger.info(f"Progress: {self.downloaded_count} downloaded, "
+                            f"{self.skipped_count} skipped, {self.failed_count} failed")
             return True
-            
+
         except Exception as e:
             logger.error(f"✗ Failed to download {url}: {e}")
             self.failed_count += 1
             return False
-    
+
     def get_local_path(self, url):
         """Convert URL to local file path."""
-        parsed = urlparse(url)
-        # Remove the base URL part to get relative path
-        relative_path = parsed.path
-        if relative_path.startswith('/ubuntu-ports/pool/universe/'):
-            relative_path = relative_path.replace('/ubuntu-ports/pool/universe/', '', 1)
-        
-        local_path = os.path.join(self.output_dir, relative_path)
-        return local_path
-    
-    def crawl_and_download(self, url, depth=0):
-        """Recursively crawl directories and download files."""
+        # The base URL is fixed, so a prefix strip replaces the urlparse
+        # tuple allocation this method used to pay per file
+        relative_path = url.removeprefix(self._strip_prefix).lstrip('/')
+        return os.path.join(self.output_dir, relative_path)
+
+    async def crawl_directory(self, dir_q, file_q, url, depth):
+        """Crawl one directory listing and enqueue subdirectories and files."""
         if depth > 20:  # Prevent infinite recursion
             logger.warning(f"Maximum depth reached for {url}")
             return
-        
+
         indent = "  " * depth
         logger.info(f"{indent}Exploring: {url}")
-        
-        links = self.get_directory_listing(url)
-        
+
+        links = await self.get_directory_listing(url)
+
         if not links:
             logger.warning(f"{indent}No links found in {url}")
             return
-        
+
         for link in links:
             full_url = urljoin(url + '/', link)
-            
+
             if self.is_directory(link):
                 # At first level (depth=0), check if directory should be processed
                 if depth == 0 and not self.should_process_directory(link):
                     logger.info(f"{indent}Skipping directory (filtered): {link}")
                     continue
-                
-                # Recursively crawl subdirectory
-                self.crawl_and_download(full_url, depth + 1)
+
+                # Enqueue subdirectory for crawling
+                await dir_q.put((full_url, depth + 1))
             else:
-                # Download file
+                # Enqueue file for download
                 local_path = self.get_local_path(full_url)
-                self.download_file(full_url, local_path)
-                
-                # Small delay to be nice to the server
-                time.sleep(0.1)
-    
+                await file_q.put((full_url, local_path))
+
+    async def _crawl_worker(self, dir_q, file_q):
+        """Drain directory tasks, feeding both queues."""
+        while True:
+            url, depth = await dir_q.get()
+            try:
+                await self.crawl_directory(dir_q, file_q, url, depth)
+            finally:
+                dir_q.task_done()
+
+    async def _download_worker(self, file_q):
+        """Drain file download tasks."""
+        while True:
+            url, local_path = await file_q.get()
+            try:
+                await self.download_file(url, local_path)
+            finally:
+                file_q.task_done()
+
+    async def crawl_and_download(self, url):
+        """Crawl directories and download files concurrently."""
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=75)
+        self.semaphore = asyncio.Semaphore(self.PER_HOST_LIMIT)
+        self._write_pool = ThreadPoolExecutor(max_workers=self.NUM_DOWNLOADERS)
+
+        if httpx is not None:
+            # Listings are tiny and numerous; h2 multiplexing keeps them from
+            # serializing behind each other. Downloads stay on HTTP/1.1 since
+            # they already saturate a connection each.
+            try:
+                self.listing_client = httpx.AsyncClient(
+                    http2=True,
+                    headers=self.headers,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+                    follow_redirects=True,
+                )
+            except ImportError:
+                # httpx present but without working HTTP/2 support
+                logger.warning("httpx lacks HTTP/2 support, using HTTP/1.1 for listings")
+                self.listing_client = None
+
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers) as session:
+            self.session = session
+
+            # Discovery (dir_q) and fetching (file_q) run as separate
+            # pipelines so downloads never block directory listings. dir_q
+            # stays unbounded: crawlers both produce and consume it, and a
+            # bound could deadlock all of them on a full put. file_q is
+            # bounded to keep discovery from racing far ahead of the disk.
+            dir_q = asyncio.Queue()
+            file_q = asyncio.Queue(maxsize=self.FILE_QUEUE_SIZE)
+
+            crawlers = [asyncio.create_task(self._crawl_worker(dir_q, file_q))
+                        for _ in range(self.NUM_CRAWLERS)]
+            downloaders = [asyncio.create_task(self._download_worker(file_q))
+                           for _ in range(self.NUM_DOWNLOADERS)]
+
+            try:
+                # Prefer the Packages.gz index over crawling HTML listings
+                entries = await self._load_package_index()
+                if entries:
+                    logger.info(f"Package index enumerates {len(entries)} files, skipping HTML crawl")
+                    for file_url, local_path in entries:
+                        relative = os.path.relpath(local_path, self.output_dir)
+                        first_dir = relative.split(os.sep, 1)[0]
+                        if not self.should_process_directory(first_dir):
+                            continue
+                        await file_q.put((file_url, local_path))
+                else:
+                    logger.info("Package index unavailable, falling back to HTML crawl")
+                    await dir_q.put((url, 0))
+
+                await dir_q.join()
+                await file_q.join()
+            finally:
+                for w in crawlers + downloaders:
+                    w.cancel()
+                await asyncio.gather(*crawlers, *downloaders, return_exceptions=True)
+                if self.listing_client is not None:
+                    await self.listing_client.aclose()
+                    self.listing_client = None
+                self._write_pool.shutdown(wait=True)
+                self._write_pool = None
+
     def start(self):
         """Start the download process."""
         logger.info("="*70)
@@ -185,16 +560,18 @@ class UbuntuPortsDownloader:
         if self.end_dir:
             logger.info(f"End Directory: {self.end_dir}")
         logger.info("="*70)
-        
+
         start_time = time.time()
-        
+
         try:
-            self.crawl_and_download(self.base_url)
+            asyncio.run(self.crawl_and_download(self.base_url))
         except KeyboardInterrupt:
             logger.info("\n\nDownload interrupted by user")
-        
+        finally:
+            self._save_hash_index()
+
         elapsed = time.time() - start_time
-        
+
         logger.info("="*70)
         logger.info("Download Summary")
         logger.info(f"Downloaded: {self.downloaded_count} files")
@@ -232,14 +609,14 @@ Examples:
   python download_ubuntu_ports.py --url https://ports.ubuntu.com/ubuntu-ports/pool/universe --output downloads --start-dir h --end-dir m
         '''
     )
-    
+
     parser.add_argument(
         '--url',
         type=str,
         default='https://ports.ubuntu.com/ubuntu-ports/pool/universe',
         help='Base URL to download from (default: %(default)s)'
     )
-    
+
     parser.add_argument(
         '--output',
         '-o',
@@ -247,23 +624,37 @@ Examples:
         default='ubuntu_ports_downloads',
         help='Output directory to save downloaded files (default: %(default)s)'
     )
-    
+
     parser.add_argument(
         '--start-dir',
         type=str,
         default=None,
         help='First-level directory to start from (e.g., "h" to start from h/). Useful for resuming or splitting downloads.'
     )
-    
+
     parser.add_argument(
         '--end-dir',
         type=str,
         default=None,
         help='First-level directory to end at (e.g., "m" to stop at m/). Useful for downloading specific ranges.'
     )
-    
+
+    parser.add_argument(
+        '--suite',
+        type=str,
+        default='noble',
+        help='Distribution suite whose Packages.gz index enumerates the files (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--arch',
+        type=str,
+        default='arm64',
+        help='Architecture for the Packages.gz index (default: %(default)s)'
+    )
+
     args = parser.parse_args()
-    
+
     # Log configuration
     logger.info(f"Starting download from: {args.url}")
     logger.info(f"Files will be saved to: {args.output}")
@@ -271,11 +662,11 @@ Examples:
         logger.info(f"Starting from directory: {args.start_dir}")
     if args.end_dir:
         logger.info(f"Ending at directory: {args.end_dir}")
-    
-    downloader = UbuntuPortsDownloader(args.url, args.output, args.start_dir, args.end_dir)
+
+    downloader = UbuntuPortsDownloader(args.url, args.output, args.start_dir, args.end_dir,
+                                       suite=args.suite, arch=args.arch)
     downloader.start()
 
 
 if __name__ == "__main__":
     main()
-